@@ -1,12 +1,22 @@
 # setup.py
+import os
 from setuptools import setup, find_packages
 
+# Compilación opcional del parser y del validador con mypyc (DOTPROMPT_USE_MYPYC=1 pip install .).
+# Sin la variable se instala el paquete en Python puro.
+ext_modules = []
+if os.environ.get("DOTPROMPT_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify(["src/dotprompt/parse.py", "src/dotprompt/validators.py"])
+
 setup(
     name="dotprompt",
     version="0.0.1",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    ext_modules=ext_modules,
     install_requires=[], 
+    extras_require={"orjson": ["orjson"], "re2": ["google-re2"]},
     python_requires=">=3.7",
     description="A library for working with .prompt files",
     author="Diego Ponce de Leon Franco",
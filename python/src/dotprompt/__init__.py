@@ -5,7 +5,8 @@ __version__ = "0.0.1"
 from .core import content, defaults, metadata, variables
 from .creator import PromptBuilder, create
 from .models import PromptObject
-from .validators import file_validator
+from .parse import load_many
+from .validators import file_validator, validate_files
 
 def save(obj: PromptObject, filepath: str) -> str:
     """Guarda un PromptObject en un archivo .prompt."""
@@ -30,7 +31,7 @@ def validate(filepath: str) -> Dict[str, Any]:
     return file_validator(filepath)
 
 __all__ = [
-    'create', 'save', 'open', 'from_text', 'from_json', 'to_json', 'to_text','validate',
+    'create', 'save', 'open', 'from_text', 'from_json', 'to_json', 'to_text','validate', 'validate_files', 'load_many',
     'content', 'defaults', 'metadata', 'variables',
     'PromptObject', 'PromptBuilder'
 ]
\ No newline at end of file
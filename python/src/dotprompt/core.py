@@ -1,22 +1,47 @@
 # core.py
-from .parse import PromptParser
+import os
+import functools
+from .parse import PromptParser, _stat_key
 from .models import PromptObject
-from typing import Dict, Any
+from typing import Dict, Any, Union
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> PromptObject:
+    """Parsea un archivo .prompt; los argumentos son la clave que devuelve _stat_key."""
+    return PromptParser.from_file(path)
+
+def _is_inline_text(prompt: str) -> bool:
+    """Indica si el argumento es texto .prompt directo y no una ruta, sin tocar el disco."""
+    return '\n' in prompt or len(prompt) > 4096
+
+def _load(filepath: Union[str, 'os.PathLike[str]']) -> PromptObject:
+    """
+    Devuelve el PromptObject de una ruta o de texto .prompt directo.
+
+    Los archivos se cachean y solo se re-parsean si cambiaron; el texto
+    directo se parsea sin consultar el sistema de archivos.
+    """
+    if isinstance(filepath, str) and _is_inline_text(filepath):
+        return PromptParser(filepath).obj
+    key = _stat_key(filepath)
+    if key is None:
+        raise FileNotFoundError(f"El archivo '{filepath}' no existe")
+    return _parse_cached(*key)
 
 def content(filepath: str, **kwargs: Any) -> str:
-    """Procesa el contenido de un archivo .prompt."""
-    prompt = PromptParser.from_file(filepath)
+    """Procesa el contenido de un archivo .prompt o de texto .prompt directo."""
+    prompt = _load(filepath)
     return prompt.process(**kwargs)
 
 def defaults(filepath: str) -> Dict[str, str]:
-    """Devuelve los defaults de un archivo .prompt."""
-    return PromptParser.from_file(filepath).defaults
+    """Devuelve los defaults de un archivo .prompt o de texto .prompt directo."""
+    return dict(_load(filepath).defaults)
 
 def metadata(filepath: str) -> Dict[str, str]:
-    """Devuelve los metadata de un archivo .prompt."""
-    return PromptParser.from_file(filepath).metadata
+    """Devuelve los metadata de un archivo .prompt o de texto .prompt directo."""
+    return dict(_load(filepath).metadata)
 
 def variables(filepath: str) -> Dict[str, Dict[str, Any]]:
     """Devuelve información sobre las variables en el contenido."""
-    prompt = PromptParser.from_file(filepath)
+    prompt = _load(filepath)
     return prompt.get_variables_info()
\ No newline at end of file
@@ -20,7 +20,7 @@ class PromptBuilder:
     def metadata(self, key: Union[str, Dict[str, str]], value: Optional[str] = None) -> 'PromptBuilder':
         """
         Agrega metadatos al prompt, ya sea un solo campo o múltiples.
-        Preserva el format_version por defecto si no se especifica otro.
+        Si el diccionario trae format_version, sustituye al actual; si no, se conserva.
         
         Args:
             key: Una clave (str) o un diccionario de metadatos (Dict[str, str]).
@@ -34,9 +34,7 @@ class PromptBuilder:
         """
         if isinstance(key, dict):
             # Si se pasa un diccionario, actualizar los metadatos
-            format_version = self._metadata.get("format_version", "0.0.1")
             self._metadata.update(key)
-            self._metadata["format_version"] = format_version
         elif isinstance(key, str):
             # Si se pasa una clave individual, requerir un valor
             if value is None:
@@ -85,10 +83,15 @@ class PromptBuilder:
         self._content = text.strip()
         return self
     
-    def build(self) -> PromptObject:
+    def build(self, copy: bool = True) -> PromptObject:
         """
         Construye un PromptObject con los componentes configurados.
         
+        Args:
+            copy (bool): Si es False, el objeto comparte los dicts de metadata y
+                defaults con el builder (sin copiarlos); modificar el builder
+                después modifica también el objeto devuelto.
+        
         Returns:
             PromptObject: El objeto construido.
         
@@ -98,8 +101,8 @@ class PromptBuilder:
         if not self._content:
             raise ValueError("El contenido del prompt no puede estar vacío")
         return PromptObject(
-            metadata=self._metadata.copy(),
-            defaults=self._defaults.copy(),
+            metadata=self._metadata.copy() if copy else self._metadata,
+            defaults=self._defaults.copy() if copy else self._defaults,
             content=self._content
         )
     
@@ -113,7 +116,7 @@ class PromptBuilder:
         Returns:
             str: Ruta absoluta del archivo guardado.
         """
-        prompt_obj = self.build()
+        prompt_obj = self.build(copy=False)
         return prompt_obj.save(filepath)
 
 # Añadir al final del archivo creator.py, después de la clase PromptBuilder
@@ -174,10 +177,14 @@ def create(metadata=None, defaults=None, content=None, **kwargs):
     default_dict = {}
     
     for key, value in kwargs.items():
-        if key.startswith("meta_"):
-            meta_dict[key[5:]] = value  # Eliminar el prefijo 'meta_'
-        elif key.startswith("default_"):
-            default_dict[key[8:]] = value  # Eliminar el prefijo 'default_'
+        # Una sola partición separa el prefijo ('meta' o 'default') del nombre
+        prefix, sep, name = key.partition("_")
+        if not sep:
+            continue
+        if prefix == "meta":
+            meta_dict[name] = value
+        elif prefix == "default":
+            default_dict[name] = value
     
     # Agregar los metadatos y defaults de kwargs si existen
     if meta_dict:
@@ -186,7 +193,8 @@ def create(metadata=None, defaults=None, content=None, **kwargs):
     if default_dict:
         builder.defaults(default_dict)
     
-    return builder.build()
+    # El builder se descarta aquí, así que no hace falta copiar sus dicts
+    return builder.build(copy=False)
 
 # Ejemplo de uso
 if __name__ == "__main__":
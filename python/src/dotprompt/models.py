@@ -1,25 +1,87 @@
 # models.py
 import os
+import re
+import sys
 import json
-from typing import Dict, Any
+import warnings
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # Dependencia opcional: pip install dotprompt[orjson]
+    orjson = None  # type: ignore[assignment]
+
+_COMMENT_RE = re.compile(r'\(%[^%]*?%\)', re.DOTALL)
+_DOUBLE_BRACE_RE = re.compile(r'{{(.*?)}}')
+_VAR_RE = re.compile(r'\{(\w+)\}')
+
+def _json_loads(json_str: str) -> Any:
+    """Decodifica JSON con orjson si está instalado, o con la librería estándar."""
+    if orjson is not None:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            # NaN, enteros fuera de rango, etc.: json decide y da sus propios errores
+            pass
+    return json.loads(json_str)
+
+def _format_field(key: str, value: Any) -> str:
+    """Serializa un campo como '@key valor' o, si tiene saltos de línea, como bloque '@key >'."""
+    if type(value) is not str:
+        value = str(value)
+    if "\n" in value:
+        # Bloque multilínea completo en un solo fragmento, cada línea con dos espacios
+        return f"@{key} >\n  " + value.replace("\n", "\n  ")
+    return f"@{key} {value}"
+
+def _compile_template(text: str):
+    """
+    Convierte el contenido normalizado en una plantilla para str.format.
+
+    Los campos se numeran por posición (una variable puede llamarse {1}, que
+    format_map interpretaría como argumento posicional) y las llaves literales
+    se escapan.
+
+    Returns:
+        Tupla (plantilla, nombres de variables en orden de aparición)
+    """
+    names: List[str] = []
+    index: Dict[str, int] = {}
+    chunks: List[str] = []
+    for i, part in enumerate(_VAR_RE.split(text)):
+        if i % 2:
+            if part not in index:
+                part = sys.intern(part)
+                index[part] = len(names)
+                names.append(part)
+            chunks.append('{%d}' % index[part])
+        else:
+            chunks.append(part.replace('{', '{{').replace('}', '}}'))
+    return ''.join(chunks), names
 
 class PromptObject:
+    __slots__ = ('metadata', 'defaults', 'content', '_compiled')
+
     def __init__(self, metadata: dict, defaults: dict, content: str):
         self.metadata = metadata
         self.defaults = defaults
         self.content = content
+        # (contenido, plantilla, nombres, frozenset de nombres); ver _compile
+        self._compiled: Optional[Tuple[str, str, Tuple[str, ...], FrozenSet[str]]] = None
     
     @property
     def text(self) -> str:
         """Devuelve el texto completo en formato .prompt."""
-        parts = ["[METADATA]"]
-        parts.append(self._serialize_section(self.metadata))
+        lines = ["[METADATA]"]
+        lines.extend(self._section_lines(self.metadata) or [""])
         if self.defaults:
-            parts.append("\n[DEFAULTS]")
-            parts.append(self._serialize_section(self.defaults))
-        parts.append("\n[CONTENT]")
-        parts.append(self.content)
-        return "\n".join(parts)
+            lines.append("")
+            lines.append("[DEFAULTS]")
+            lines.extend(self._section_lines(self.defaults))
+        lines.append("")
+        lines.append("[CONTENT]")
+        lines.append(self.content)
+        return "\n".join(lines)
     
     def metadata_text(self) -> str:
         """Devuelve solo la sección [METADATA] como texto."""
@@ -34,24 +96,16 @@ class PromptObject:
         return "[CONTENT]\n" + self.content
     
     def _serialize_section(self, section: Dict[str, Any]) -> str:
-        lines = []
-        for key, value in section.items():
-            if "\n" in str(value):
-                lines.append(f"@{key} >")
-                for line in str(value).split("\n"):
-                    lines.append(f"  {line}")
-            else:
-                lines.append(f"@{key} {value}")
-        return "\n".join(lines)
+        return "\n".join(self._section_lines(section))
+    
+    def _section_lines(self, section: Dict[str, Any]) -> List[str]:
+        return [_format_field(key, value) for key, value in section.items()]
     
     def get_variables_info(self) -> Dict[str, Dict[str, Any]]:
         """Devuelve información sobre las variables en el contenido."""
-        import re
-        processed = re.sub(r'\(%[^%]*?%\)', '', self.content, flags=re.DOTALL)
-        processed = re.sub(r'{{(.*?)}}', r'{\1}', processed)
-        variables = set(re.findall(r'\{(\w+)\}', processed))
+        _, names, _ = self._compile()
         result = {}
-        for var in variables:
+        for var in names:
             has_default = var in self.defaults
             default_value = self.defaults.get(var, None)
             result[var] = {
@@ -60,35 +114,102 @@ class PromptObject:
             }
         return result
     
+    def _compile(self):
+        """
+        Devuelve la plantilla del contenido y sus variables.
+
+        El resultado se guarda junto al string de contenido del que se obtuvo,
+        así que solo se recalcula cuando self.content cambia.
+
+        Returns:
+            Tupla (plantilla, nombres en orden de aparición, frozenset de nombres)
+        """
+        compiled = self._compiled
+        if compiled is None or compiled[0] is not self.content:
+            processed = _COMMENT_RE.sub('', self.content)
+            processed = _DOUBLE_BRACE_RE.sub(r'{\1}', processed)
+            template, names = _compile_template(processed)
+            compiled = self._compiled = (self.content, template, tuple(names), frozenset(names))
+        return compiled[1:]
+
     def process(self, **kwargs: Any) -> str:
         """Procesa el contenido sustituyendo variables."""
-        import re
-        import warnings
-        processed = re.sub(r'\(%[^%]*?%\)', '', self.content, flags=re.DOTALL)
-        processed = re.sub(r'{{(.*?)}}', r'{\1}', processed)
-        variables = set(re.findall(r'\{(\w+)\}', processed))
-        
-        extra_kwargs = set(kwargs.keys()) - variables
+        result, _, _, warning_message = self._process(kwargs)
+        if warning_message:
+            warnings.warn(warning_message, stacklevel=2)
+        return result
+
+    def process_with_diagnostics(self, **kwargs: Any) -> Tuple[str, Dict[str, List[str]]]:
+        """
+        Procesa el contenido como process(), pero devuelve los avisos en vez de emitirlos.
+
+        Returns:
+            Tupla (texto procesado, {'used_defaults': [...], 'missing': [...]})
+        """
+        result, used_defaults, missing_keys, _ = self._process(kwargs)
+        return result, {"used_defaults": list(used_defaults), "missing": list(missing_keys)}
+
+    def _process(self, kwargs: Dict[str, Any]):
+        """
+        Sustituye las variables, con un atajo para el caso sin defaults ni avisos.
+
+        Returns:
+            Tupla (texto procesado, defaults usados, variables sin valor, mensaje de aviso o None)
+        """
+        template, names, variables = self._compile()
+
+        # Caso habitual: kwargs cubre exactamente las variables, sin defaults ni avisos
+        if len(kwargs) == len(variables) and variables.issuperset(kwargs):
+            args = []
+            for key in names:
+                value = kwargs[key]
+                if value is None:
+                    break
+                args.append(str(value))
+            else:
+                return template.format(*args), (), (), None
+
+        return self._render(template, names, variables, kwargs)
+
+    def _render(self, template: str, names: tuple, variables: frozenset, kwargs: Dict[str, Any]):
+        """
+        Sustituye las variables en la plantilla.
+
+        Returns:
+            Tupla (texto procesado, defaults usados, variables sin valor, mensaje de aviso o None)
+        """
+        extra_kwargs = [key for key in kwargs if key not in variables]
         if extra_kwargs:
             raise ValueError(f"Los siguientes kwargs no corresponden a variables: {', '.join(sorted(extra_kwargs))}")
         
-        values = {}
-        for key in variables:
-            values[key] = kwargs.get(key, self.defaults.get(key))
+        defaults = self.defaults
+        args = []
+        used_defaults = []
+        missing_keys = []
+        for key in names:
+            if key in kwargs:
+                value = kwargs[key]
+            elif key in defaults:
+                value = defaults[key]
+                used_defaults.append(key)
+            else:
+                value = None
+            if value is None:
+                missing_keys.append(key)
+                # Las variables sin valor se dejan como placeholder literal
+                args.append('{' + key + '}')
+            else:
+                args.append(str(value))
         
+        used_defaults = sorted(used_defaults)
+        missing_keys = sorted(missing_keys)
         warnings_messages = []
-        used_defaults = {key for key in variables if key not in kwargs and key in self.defaults}
         if used_defaults:
-            warnings_messages.append(f"Using default values for: {', '.join(sorted(used_defaults))}.")
-        missing_keys = {key for key in variables if values[key] is None}
+            warnings_messages.append(f"Using default values for: {', '.join(used_defaults)}.")
         if missing_keys:
-            warnings_messages.append(f"The following variables were not provided: {', '.join(sorted(missing_keys))}.")
-        if warnings_messages:
-            warnings.warn("\n".join(warnings_messages), stacklevel=2)
+            warnings_messages.append(f"The following variables were not provided: {', '.join(missing_keys)}.")
         
-        return re.sub(r'\{(\w+)\}', 
-                      lambda m: str(values[m.group(1)]) if values[m.group(1)] is not None else m.group(0), 
-                      processed)
+        return template.format(*args), tuple(used_defaults), tuple(missing_keys), "\n".join(warnings_messages) or None
     
     def to_json(self) -> str:
         """Convierte el PromptObject a JSON."""
@@ -106,7 +227,7 @@ class PromptObject:
     @classmethod
     def from_json(cls, json_str: str) -> 'PromptObject':
         """Crea un PromptObject desde JSON."""
-        data = json.loads(json_str)
+        data = _json_loads(json_str)
         if not isinstance(data, dict) or "metadata" not in data or "content" not in data:
             raise ValueError("JSON inválido: debe contener 'metadata' y 'content'")
         if "format_version" not in data["metadata"]:
@@ -127,15 +248,13 @@ class PromptObject:
         Returns:
             str: Ruta absoluta del archivo guardado.
         """
-        import os
-        
         # Asegurar que la ruta sea absoluta
         absolute_path = os.path.abspath(filepath)
         
         # Crear el directorio si no existe
         directory = os.path.dirname(absolute_path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
         
         # Escribir el contenido del prompt al archivo
         with open(absolute_path, 'w', encoding='utf-8') as f:
@@ -1,70 +1,161 @@
 # parse.py
 import os
-from typing import Dict
+import re
+import sys
+import stat
+import mmap
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from .models import PromptObject
 
+_SECTION_HEADER_RE = re.compile(r'\[\s*(METADATA|DEFAULTS|CONTENT)\s*\]', re.IGNORECASE)
+_LINE_COMMENT_RE = re.compile(r'\(%[^%]*?%\)$')
+
+# A partir de este tamaño el archivo se lee con mmap en vez de read()
+_MMAP_THRESHOLD = 64 * 1024
+
+def _stat_key(filepath: Union[str, 'os.PathLike[str]']) -> Optional[Tuple[str, int, int]]:
+    """
+    Devuelve la clave de caché de un archivo regular: (ruta absoluta, mtime_ns, tamaño).
+
+    Editar el archivo cambia la clave, lo que invalida las entradas cacheadas
+    con ella.
+
+    Returns:
+        La clave, o None si la ruta no existe o no es un archivo regular
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return os.path.abspath(filepath), st.st_mtime_ns, st.st_size
+
+def _read_text(filepath: str) -> str:
+    """Lee un archivo UTF-8; los grandes se decodifican directamente desde un mmap."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return str(mm, 'utf-8')
+        return f.read().decode('utf-8')
+
+def _read_prompt_file(filepath: str) -> str:
+    """Lee un archivo .prompt; si no existe lanza FileNotFoundError con el mensaje habitual."""
+    try:
+        return _read_text(filepath)
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        raise FileNotFoundError(f"El archivo '{filepath}' no existe") from None
+
+def _iter_prompt_lines(filepath: str) -> Iterator[str]:
+    """
+    Recorre un archivo .prompt línea a línea sin cargarlo entero en memoria.
+
+    Cada línea física se pasa por splitlines() para cortar en los mismos
+    separadores que str.splitlines() sobre el texto completo.
+    """
+    try:
+        f = open(filepath, encoding='utf-8', newline='')
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        raise FileNotFoundError(f"El archivo '{filepath}' no existe") from None
+    with f:
+        for physical_line in f:
+            yield from physical_line.splitlines()
+
 class PromptParser:
     """Parsea texto en formato .prompt y devuelve un PromptObject."""
+
+    __slots__ = ('obj',)
     
     def __init__(self, text: str):
-        import re
-        if not text.strip():
-            raise ValueError("El texto del prompt no puede estar vacío")
-        
-        sections = {"metadata": {}, "defaults": {}, "content": []}
-        current_section = None
-        current_key = None
-        section_header = re.compile(r'\[\s*(METADATA|DEFAULTS|CONTENT)\s*\]', re.IGNORECASE)
-        comment_pattern = re.compile(r'\(%[^%]*?%\)$')
-        
-        section_positions = {}
-        for i, raw_line in enumerate(text.splitlines()):
+        self.obj = self._from_lines(text.splitlines())
+
+    @classmethod
+    def _from_lines(cls, lines: Iterable[str]) -> PromptObject:
+        """
+        Ejecuta el parseo en una sola pasada sobre un iterable de líneas.
+
+        Args:
+            lines: Líneas del prompt, sin el salto de línea final
+
+        Returns:
+            PromptObject: El objeto parseado
+        """
+        sections: Dict[str, Any] = {"metadata": {}, "defaults": {}, "content": []}
+        current_section: Optional[str] = None
+        current_key: Optional[str] = None
+        content_seen: bool = False
+        is_empty: bool = True
+        # El error de metadata vacía se difiere: un orden de secciones incorrecto
+        # en cualquier parte del texto tiene prioridad sobre él
+        empty_metadata_error: Optional[str] = None
+
+        for i, raw_line in enumerate(lines):
             line = raw_line.strip()
-            if not line or line.startswith('#'):
+            if not line:
                 continue
-            header_match = section_header.fullmatch(line)
-            if header_match:
-                section_positions[header_match.group(1).lower()] = i
-        
-        if 'content' in section_positions and 'defaults' in section_positions:
-            if section_positions['defaults'] > section_positions['content']:
-                raise ValueError("Incorrect section order: [DEFAULTS] must appear before [CONTENT]")
-        
-        for i, raw_line in enumerate(text.splitlines()):
-            line = raw_line.strip()
-            if not line or (line.startswith('(%') and line.endswith('%)')):
+            is_empty = False
+            first = line[0]
+            if first == '(' and line.startswith('(%') and line.endswith('%)'):
                 continue
-            header_match = section_header.fullmatch(line)
+            header_match: Optional[re.Match[str]] = None
+            if first == '[' and line.endswith(']'):
+                header_match = _SECTION_HEADER_RE.fullmatch(line)
             if header_match:
                 current_section = header_match.group(1).lower()
                 current_key = None
+                if current_section == "content":
+                    content_seen = True
+                elif current_section == "defaults" and content_seen:
+                    raise ValueError("Incorrect section order: [DEFAULTS] must appear before [CONTENT]")
                 continue
             if current_section in ("metadata", "defaults"):
-                if line.startswith('@'):
-                    if '>' in line:
-                        key = line.split('>', 1)[0][1:].strip()
+                if first == '@':
+                    head, marker, _ = line.partition('>')
+                    if marker:
+                        key = sys.intern(head[1:].strip())
                         current_key = key
-                        sections[current_section][key] = ""
+                        # Los valores multilínea se acumulan en una lista y se unen al final
+                        sections[current_section][key] = [""]
                     else:
-                        parts = line[1:].split(' ', 1)
-                        key = parts[0].strip()
-                        value = parts[1].strip() if len(parts) > 1 else ""
-                        if current_section == "metadata" and not value:
-                            raise ValueError(f"Linea {i+1}: Metadata '@{key}' no puede tener valor vacío")
+                        key, _, value = line[1:].partition(' ')
+                        key = sys.intern(key.strip())
+                        value = value.strip()
+                        if not value and current_section == "metadata" and empty_metadata_error is None:
+                            empty_metadata_error = f"Linea {i+1}: Metadata '@{key}' no puede tener valor vacío"
                         sections[current_section][key] = value
                 elif current_key:
-                    sections[current_section][current_key] += "\n" + line
+                    fragments = sections[current_section][current_key]
+                    if isinstance(fragments, list):
+                        fragments.append(line)
+                    else:
+                        sections[current_section][current_key] = [fragments, line]
             elif current_section == "content":
-                line = comment_pattern.sub('', line).strip()
+                # El patrón está anclado al final: solo puede coincidir si la línea acaba en '%)'
+                if line.endswith('%)'):
+                    line = _LINE_COMMENT_RE.sub('', line).strip()
                 if line:
                     sections["content"].append(line)
-        
+
+        if is_empty:
+            raise ValueError("El texto del prompt no puede estar vacío")
+        if empty_metadata_error is not None:
+            raise ValueError(empty_metadata_error)
+
+        for name in ("metadata", "defaults"):
+            section = sections[name]
+            for field_key, collected in section.items():
+                if isinstance(collected, list):
+                    section[field_key] = "\n".join(collected)
+
         if not sections["content"]:
             raise ValueError("Falta o está vacía la sección [CONTENT]")
         if 'format_version' not in sections["metadata"]:
             raise ValueError("Falta @format_version en [METADATA]")
         
-        self.obj = PromptObject(
+        return PromptObject(
             metadata=sections["metadata"],
             defaults=sections["defaults"],
             content="\n".join(sections["content"])
@@ -72,13 +163,64 @@ class PromptParser:
 
     @classmethod
     def from_file(cls, filepath: str) -> PromptObject:
-        """Lee un archivo .prompt y devuelve un PromptObject."""
-        if not os.path.isfile(filepath):
-            raise FileNotFoundError(f"El archivo '{filepath}' no existe")
-        with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
-        return cls(text).obj
+        """Lee un archivo .prompt línea a línea y devuelve un PromptObject."""
+        return cls._from_lines(_iter_prompt_lines(filepath))
+
+    @classmethod
+    def from_files(cls, filepaths: Iterable[str], max_workers: int = 8) -> Iterator[Tuple[str, PromptObject]]:
+        """
+        Lee varios archivos .prompt y va devolviendo (ruta, PromptObject).
+
+        Las lecturas se hacen en un pool de hilos (liberan el GIL) mientras el
+        parseo ocurre en el hilo que consume el generador; los resultados salen
+        en el orden de filepaths. Como mucho hay max_workers * 2 lecturas en
+        curso o pendientes de consumir, así que la memoria no crece con el
+        número de archivos.
+
+        Args:
+            filepaths: Rutas de los archivos .prompt
+            max_workers: Número de hilos de lectura
+
+        Yields:
+            Tuple[str, PromptObject]: La ruta y el objeto parseado
+        """
+        paths = iter(filepaths)
+        pending: Deque[Tuple[str, 'Future[str]']] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for filepath in islice(paths, max_workers * 2):
+                    pending.append((filepath, executor.submit(_read_prompt_file, filepath)))
+                while pending:
+                    filepath, future = pending.popleft()
+                    text = future.result()
+                    for next_path in islice(paths, 1):
+                        pending.append((next_path, executor.submit(_read_prompt_file, next_path)))
+                    yield filepath, cls(text).obj
+            finally:
+                # Si el consumidor se detiene o hay un error, no se leen los archivos restantes
+                for _, future in pending:
+                    future.cancel()
 
 def from_file(filepath: str) -> PromptObject:
     """Función de alto nivel para parsear un archivo .prompt."""
-    return PromptParser.from_file(filepath)
\ No newline at end of file
+    return PromptParser.from_file(filepath)
+
+def load_many(filepaths: Iterable[str], max_workers: Optional[int] = None) -> List[PromptObject]:
+    """
+    Lee y parsea varios archivos .prompt en paralelo.
+
+    La lectura libera el GIL, así que un pool de hilos solapa la E/S de los
+    archivos; el orden del resultado es el de filepaths.
+
+    Args:
+        filepaths: Rutas de los archivos .prompt
+        max_workers: Número de hilos (por defecto, uno por archivo hasta 32)
+
+    Returns:
+        List[PromptObject]: Un objeto por archivo
+    """
+    filepaths = list(filepaths)
+    if not filepaths:
+        return []
+    workers = max_workers or min(32, len(filepaths))
+    return [obj for _, obj in PromptParser.from_files(filepaths, max_workers=workers)]
\ No newline at end of file
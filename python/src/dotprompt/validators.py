@@ -1,14 +1,33 @@
 import re
-from typing import Dict, List, Optional, Set, Any, Tuple
+import sys
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Any, Tuple
+from .parse import _read_text, _stat_key
+
+try:
+    import re2  # type: ignore[import-not-found]
+except ImportError:  # Optional dependency: pip install dotprompt[re2]
+    re2 = None
+
+# The inline-comment patterns scan user-supplied CONTENT, so they use the
+# linear-time RE2 engine when it is installed
+_comment_re = re2 if re2 is not None else re
 
 class PromptValidator:
     """Validates .prompt files for required sections, order, and content."""
     
+    __slots__ = ('text', 'filepath', 'lines', '_section_positions', 'sections',
+                 '_content_text', '_clean_content', 'result')
+    
     SECTION_PATTERN = re.compile(r'\[\s*(METADATA|DEFAULTS|CONTENT)\s*\]', re.IGNORECASE)
-    FIELD_PATTERN = re.compile(r'^@(\w[\w\-_]{0,63})\s+(.+)$')
-    MULTILINE_PATTERN = re.compile(r'^@(\w[\w\-_]{0,63})\s+>$')
+    # Group 2 is '>' only when it is the whole value, i.e. a multiline field header
+    FIELD_PATTERN = re.compile(r'^@(\w[\w\-_]{0,63})\s+(>|.+)$')
+    INLINE_COMMENT_PATTERN = _comment_re.compile(r'\(%.*?%\)')
+    UNBALANCED_COMMENT_PATTERN = _comment_re.compile(r'\(%[^%]*$|^[^(]*%\)')
+    VARIABLE_PATTERN = re.compile(r'\{(\w+)\}')
 
-    def __init__(self, text: str = None, filepath: str = None):
+    def __init__(self, text: Optional[str] = None, filepath: Optional[str] = None):
         """
         Initializes the validator with content from text or file.
         
@@ -26,24 +45,41 @@ class PromptValidator:
         
         if filepath:
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    self.text = f.read()
-                self.filepath = filepath
+                text = _read_text(filepath)
             except FileNotFoundError:
                 raise FileNotFoundError(f"The file '{filepath}' was not found")
             except Exception as e:
                 raise ValueError(f"Error reading file '{filepath}': {str(e)}")
+            self.filepath: Optional[str] = filepath
         else:
-            self.text = text
             self.filepath = None
         
-        self.lines = self.text.splitlines()
+        assert text is not None
+        self._ingest(text)
+
+    def reset(self, text: str) -> None:
+        """
+        Reuses the validator for new .prompt content, as if it had been created with text.
+        
+        Args:
+            text: Content of the .prompt file as a string
+        """
+        self.filepath = None
+        self._ingest(text)
+
+    def _ingest(self, text: str) -> None:
+        """
+        Splits the text into lines and precomputes the sections used by the validations.
+        
+        Args:
+            text: Content of the .prompt file as a string
+        """
+        self.text = text
+        self.lines = text.splitlines()
         self._section_positions = self._calculate_section_positions()
-        self.sections = {
-            'METADATA': self._extract_section('METADATA'),
-            'DEFAULTS': self._extract_section('DEFAULTS'),
-            'CONTENT': self._extract_section('CONTENT')
-        }
+        self.sections = self._extract_sections()
+        self._content_text = '\n'.join(self.sections['CONTENT'])
+        self._clean_content = self.INLINE_COMMENT_PATTERN.sub('', self._content_text)
 
     def validate(self) -> Dict[str, Any]:
         """
@@ -52,7 +88,7 @@ class PromptValidator:
         Returns:
             Dictionary with 'valid', 'errors', and 'warnings' fields
         """
-        self.result = {
+        self.result: Dict[str, Any] = {
             "valid": True,
             "errors": [],
             "warnings": []
@@ -61,13 +97,13 @@ class PromptValidator:
         self._validate_sections_presence()
         self._validate_sections_order()
         self._validate_metadata()
-        self._validate_defaults()
+        defined_vars = self._validate_defaults()
         self._validate_content()
-        self._validate_variables()
+        self._validate_variables(defined_vars)
         
         return self.result
 
-    def _validate_sections_presence(self):
+    def _validate_sections_presence(self) -> None:
         """Validates that all required sections are present in the file."""
         found_sections = list(self._section_positions.keys())
         
@@ -79,7 +115,7 @@ class PromptValidator:
             self.result["valid"] = False
             self.result["errors"].append("Missing required section [CONTENT]")
 
-    def _validate_sections_order(self):
+    def _validate_sections_order(self) -> None:
         """Validates that sections appear in the correct order: METADATA -> DEFAULTS -> CONTENT."""
         section_positions = self._section_positions
         
@@ -96,96 +132,101 @@ class PromptValidator:
                 self.result["valid"] = False
                 self.result["errors"].append("Incorrect order: [DEFAULTS] must appear before [CONTENT]")
 
-    def _process_line(self, line: str) -> Tuple[Optional[str], bool]:
+    def _process_line(self, stripped: str) -> Tuple[Optional[str], bool]:
         """
         Processes a line to identify field names and if it's multiline.
         
         Args:
-            line: The line to process
+            stripped: The line to process, already stripped of surrounding whitespace
             
         Returns:
             Tuple containing (field_name, is_multiline) or (None, False) if not a field
         """
-        line = line.strip()
-        if not line or self._is_comment_line(line):
+        # Only lines starting with '@' can be fields (this also rules out comments)
+        if not stripped or stripped[0] != '@':
             return None, False
         
-        match = self.FIELD_PATTERN.match(line)
+        match = self.FIELD_PATTERN.match(stripped)
         if match:
-            return match.group(1), False
-        
-        match = self.MULTILINE_PATTERN.match(line)
-        if match:
-            return match.group(1), True
+            return match.group(1), match.group(2) == '>'
         
         return None, False
     
-    def _validate_metadata(self):
-        """Validates the METADATA section and its required fields."""
-        metadata_section = self.sections['METADATA']
-        if not metadata_section:
-            return
+    def _scan_field_section(self, lines: List[str], section_name: str, required: Tuple[str, ...] = ()) -> Set[str]:
+        """
+        Checks the field lines of a METADATA or DEFAULTS section.
         
-        format_version_found = False
+        Args:
+            lines: Lines of the section
+            section_name: Section name used in the messages (METADATA, DEFAULTS)
+            required: Field names that must be defined in the section
+            
+        Returns:
+            Set with the names of the fields defined in the section
+        """
+        defined: Set[str] = set()
         current_field = None
         
-        for line in metadata_section:
-            field_name, is_multiline = self._process_line(line)
+        for line in lines:
+            stripped = line.strip()
+            field_name, is_multiline = self._process_line(stripped)
             if field_name:
-                if field_name == 'format_version':
-                    format_version_found = True
+                defined.add(sys.intern(field_name))
                 current_field = field_name if is_multiline else None
-            elif not current_field and line.strip() and not self._is_comment_line(line):
-                self.result["warnings"].append(f"Invalid line in [METADATA]: '{line}'")
+            elif not current_field and stripped and not self._is_comment(stripped):
+                self.result["warnings"].append(f"Invalid line in [{section_name}]: '{line}'")
         
-        if not format_version_found:
-            self.result["valid"] = False
-            self.result["errors"].append("Missing required field @format_version in [METADATA]")
+        for required_field in required:
+            if required_field not in defined:
+                self.result["valid"] = False
+                self.result["errors"].append(f"Missing required field @{required_field} in [{section_name}]")
+        
+        return defined
 
-    def _validate_defaults(self):
-        """Validates the DEFAULTS section and its field format."""
-        defaults_section = self.sections['DEFAULTS']
-        if not defaults_section:
+    def _validate_metadata(self) -> None:
+        """Validates the METADATA section and its required fields."""
+        metadata_section = self.sections['METADATA']
+        if not metadata_section:
             return
         
-        current_field = None
+        self._scan_field_section(metadata_section, 'METADATA', required=('format_version',))
+
+    def _validate_defaults(self) -> Set[str]:
+        """
+        Validates the DEFAULTS section and its field format.
         
-        for line in defaults_section:
-            field_name, is_multiline = self._process_line(line)
-            if field_name:
-                current_field = field_name if is_multiline else None
-            elif not current_field and line.strip() and not self._is_comment_line(line):
-                self.result["warnings"].append(f"Invalid line in [DEFAULTS]: '{line}'")
+        Returns:
+            Set with the names of the variables defined in [DEFAULTS]
+        """
+        return self._scan_field_section(self.sections['DEFAULTS'], 'DEFAULTS')
 
-    def _validate_content(self):
+    def _validate_content(self) -> None:
         """Validates the CONTENT section for emptiness and proper inline comments."""
         content_section = self.sections['CONTENT']
         if not content_section:
             return
         
-        if not ''.join(content_section).strip():
+        if not any(line.strip() for line in content_section):
             self.result["valid"] = False
             self.result["errors"].append("The [CONTENT] section is empty")
         
-        inline_comment_pattern = re.compile(r'\(%.*?%\)')
-        unbalanced_pattern = re.compile(r'\(%[^%]*$|^[^(]*%\)')
-        content_text = '\n'.join(content_section)
-        
-        clean_content = inline_comment_pattern.sub('', content_text)
-        if unbalanced_pattern.search(clean_content):
+        if self.UNBALANCED_COMMENT_PATTERN.search(self._clean_content):
             self.result["warnings"].append("Possible unbalanced inline comment in [CONTENT]")
 
-    def _validate_variables(self):
-        """Validates variables and their references between CONTENT and DEFAULTS sections."""
+    def _validate_variables(self, defined_vars: Set[str]) -> None:
+        """
+        Validates variables and their references between CONTENT and DEFAULTS sections.
+        
+        Args:
+            defined_vars: Names defined in [DEFAULTS], as returned by _validate_defaults
+        """
         content_section = self.sections['CONTENT']
         defaults_section = self.sections['DEFAULTS']
         
         if not content_section:
             return
         
-        content_text = '\n'.join(content_section)
-        processed = re.sub(r'\(%.*?%\)', '', content_text)
-        variables = set(re.findall(r'\{(\w+)\}', processed))
+        variables = {sys.intern(name) for name in self.VARIABLE_PATTERN.findall(self._clean_content)}
         
         if not defaults_section:
             if variables:
@@ -194,12 +235,6 @@ class PromptValidator:
                 )
             return
         
-        defined_vars = set()
-        for line in defaults_section:
-            field_name, _ = self._process_line(line)
-            if field_name:
-                defined_vars.add(field_name)
-        
         undefined_vars = variables - defined_vars
         if undefined_vars:
             self.result["warnings"].append(
@@ -212,17 +247,19 @@ class PromptValidator:
                 f"Variables defined but not used in [CONTENT]: {', '.join(sorted(unused_vars))}"
             )
 
-    def _is_comment_line(self, line: str) -> bool:
+    def _is_comment(self, stripped: str) -> bool:
         """
         Determines if a line is a complete comment (% %).
         
         Args:
-            line: Line to evaluate
+            stripped: Line to evaluate, already stripped of surrounding whitespace
             
         Returns:
             True if the line is a comment, False otherwise
         """
-        return line.strip().startswith('(%') and line.strip().endswith('%)')
+        # Same result as startswith('(%') and endswith('%)'), including the overlapping '(%)'
+        return (len(stripped) >= 3 and stripped[0] == '(' and stripped[1] == '%'
+                and stripped[-1] == ')' and stripped[-2] == '%')
     
     def _calculate_section_positions(self) -> Dict[str, int]:
         """
@@ -231,47 +268,63 @@ class PromptValidator:
         Returns:
             Dictionary with section names as keys and line indices as values
         """
-        positions = {}
+        positions: Dict[str, int] = {}
         for i, line in enumerate(self.lines):
-            match = self.SECTION_PATTERN.match(line.strip())
+            stripped = line.strip()
+            # Only lines starting with '[' can be section headers
+            if not stripped or stripped[0] != '[':
+                continue
+            match = self.SECTION_PATTERN.match(stripped)
             if match:
                 positions[match.group(1).upper()] = i
         return positions
 
-    def _extract_section(self, section_name: str) -> List[str]:
+    def _extract_sections(self) -> Dict[str, List[str]]:
         """
-        Extracts the lines from a specific section.
+        Extracts the lines of every section in a single pass over the sorted positions.
         
-        Args:
-            section_name: Section name (METADATA, DEFAULTS, CONTENT)
-            
         Returns:
-            List of lines in the section or empty list if not found
+            Dictionary with the lines of METADATA, DEFAULTS and CONTENT (empty list if not found)
         """
-        if section_name.upper() not in self._section_positions:
-            return []
-        
-        start_line = self._section_positions[section_name.upper()] + 1
-        end_line = len(self.lines)
-        
-        for section, pos in self._section_positions.items():
-            if pos > start_line and pos < end_line:
-                end_line = pos
-        
-        return self.lines[start_line:end_line]
+        sections: Dict[str, List[str]] = {'METADATA': [], 'DEFAULTS': [], 'CONTENT': []}
+        ordered = sorted(self._section_positions.items(), key=lambda item: item[1])
+        bounds = [pos for _, pos in ordered] + [len(self.lines)]
+        
+        for i, (section_name, pos) in enumerate(ordered):
+            start_line = pos + 1
+            end_line = bounds[i + 1]
+            # A header right after another one does not close it: the section runs to the next header
+            if end_line == start_line and i + 2 < len(bounds):
+                end_line = bounds[i + 2]
+            sections[section_name] = self.lines[start_line:end_line]
+        
+        return sections
+
+@functools.lru_cache(maxsize=256)
+def _validate_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Validates a .prompt file; the arguments are the cache key returned by parse._stat_key."""
+    return PromptValidator(filepath=path).validate()
 
 def file_validator(filepath: str) -> Dict[str, Any]:
     """
     Validates a .prompt file and returns detailed results.
     
+    Results are cached per file and only recomputed when the file changes.
+    
     Args:
         filepath: Path to the .prompt file
         
     Returns:
         Dictionary with 'valid', 'errors', and 'warnings' fields
     """
-    validator = PromptValidator(filepath=filepath)
-    return validator.validate()
+    key = _stat_key(filepath)
+    if key is None:
+        # Not a regular file: let the validator raise its usual error
+        validator = PromptValidator(filepath=filepath)
+        return validator.validate()
+    result = _validate_cached(*key)
+    # Copy the lists so callers cannot modify the cached entry
+    return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
 
 def text_validator(text: str) -> Dict[str, Any]:
     """
@@ -286,7 +339,27 @@ def text_validator(text: str) -> Dict[str, Any]:
     validator = PromptValidator(text=text)
     return validator.validate()
 
-def print_validation_result(result: Dict[str, Any], filepath: str = None):
+def validate_files(filepaths: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Validates several .prompt files in parallel worker processes.
+    
+    Validation is CPU-bound regex work with no shared state, so it scales
+    with the number of cores.
+    
+    Args:
+        filepaths: Paths to the .prompt files
+        max_workers: Number of processes (defaults to the number of CPUs)
+        
+    Returns:
+        Dictionary mapping each path to its 'valid', 'errors', and 'warnings' result
+    """
+    filepaths = list(filepaths)
+    if not filepaths:
+        return {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(filepaths, executor.map(file_validator, filepaths, chunksize=8)))
+
+def print_validation_result(result: Dict[str, Any], filepath: Optional[str] = None) -> None:
     """
     Prints the validation result in a readable format.
     